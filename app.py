@@ -1,8 +1,15 @@
+import base64
 import json
+import multiprocessing
 import os
 import queue
+import random
 import sqlite3
 import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from functools import wraps
 
@@ -10,12 +17,15 @@ from flask import (
     Flask,
     Response,
     jsonify,
+    make_response,
     render_template,
     request,
     session,
     g,
     stream_with_context,
 )
+from flask.ctx import _AppCtxGlobals
+from itsdangerous import BadSignature, URLSafeTimedSerializer
 from werkzeug.security import check_password_hash, generate_password_hash
 
 
@@ -26,21 +36,336 @@ os.makedirs(DATA_DIR, exist_ok=True)
 DATABASE_PATH = os.environ.get("DATABASE_PATH", os.path.join(DATA_DIR, "data.db"))
 os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
 
+DATABASE_PRAGMA_PROFILE = os.environ.get("DATABASE_PRAGMA_PROFILE", "wal")
+DATABASE_PRAGMAS = os.environ.get("DATABASE_PRAGMAS", "")
+TASK_PAGE_MAX = int(os.environ.get("TASK_PAGE_MAX", "500"))
+TASK_BATCH_MAX = int(os.environ.get("TASK_BATCH_MAX", "500"))
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", "256"))
+EVENT_OVERFLOW_POLICY = os.environ.get("EVENT_OVERFLOW_POLICY", "resync")
+EVENT_LOG_SIZE = int(os.environ.get("EVENT_LOG_SIZE", "1000"))
+EVENT_BACKEND = os.environ.get("EVENT_BACKEND", "memory")
+EVENT_POLL_INTERVAL = float(os.environ.get("EVENT_POLL_INTERVAL", "0.25"))
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get("SSE_HEARTBEAT_INTERVAL", "25"))
+SSE_HEARTBEAT_JITTER = float(os.environ.get("SSE_HEARTBEAT_JITTER", "0.1"))
+EVENT_COALESCE_MS = float(os.environ.get("EVENT_COALESCE_MS", "0"))
+WRITE_BATCH_MS = float(os.environ.get("WRITE_BATCH_MS", "0"))
+WRITE_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", "128"))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", str(8 * 1024 * 1024)))
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", "2"))
+HASH_QUEUE_LIMIT = int(os.environ.get("HASH_QUEUE_LIMIT", str(max(HASH_WORKERS, 1) * 4)))
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", "10"))
+LOGIN_MAX_ATTEMPTS = int(os.environ.get("LOGIN_MAX_ATTEMPTS", "10"))
+LOGIN_WINDOW = float(os.environ.get("LOGIN_WINDOW", "60"))
+API_TOKEN_TTL = int(os.environ.get("API_TOKEN_TTL", str(24 * 3600)))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_LIFETIME = float(os.environ.get("DB_POOL_MAX_LIFETIME", "3600"))
+DB_POOL_CHECK_INTERVAL = float(os.environ.get("DB_POOL_CHECK_INTERVAL", "30"))
+
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.secret_key = os.environ.get("SECRET_KEY", "replace-me-in-prod")
 
-event_queues: list[queue.Queue] = []
-listeners_lock = threading.Lock()
+# Held across logging and fan-out of an event so listeners see events in id
+# order. Connecting and disconnecting clients never take it.
+broadcast_lock = threading.Lock()
+
+
+# Applied to every new connection, in order. journal_mode=WAL is persistent in
+# the database file but re-asserting it per connection is cheap.
+PRAGMA_PROFILES = {
+    "default": {
+        "busy_timeout": 5000,
+    },
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+ALLOWED_PRAGMAS = {
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "busy_timeout",
+    "foreign_keys",
+    "wal_autocheckpoint",
+}
+
+
+def resolve_pragmas(profile: str, overrides: str = "") -> dict:
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown DATABASE_PRAGMA_PROFILE {profile!r}")
+    pragmas = dict(PRAGMA_PROFILES[profile])
+    for item in overrides.split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        name, value = name.strip().lower(), value.strip()
+        if name not in ALLOWED_PRAGMAS or not value.replace("-", "").isalnum():
+            raise ValueError(f"Unsupported pragma override {item.strip()!r}")
+        pragmas[name] = value
+    return pragmas
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Events logged in the open transaction, published on commit.
+        self.pending_events = []
+
+
+# Bounded LIFO pool. A connection is used by one request at a time but may be
+# released from another thread (streamed responses), hence check_same_thread.
+class ConnectionPool:
+    def __init__(self, path, size, timeout, max_lifetime, check_interval, pragmas=None):
+        self.path = path
+        self.pragmas = pragmas or {}
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self._idle: list[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, factory=PooledConnection
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _expired(self, conn, now):
+        return now - conn.created_at > self.max_lifetime
+
+    def _healthy(self, conn, now):
+        if self._expired(conn, now):
+            return False
+        if now - conn.last_used < self.check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout("Timed out waiting for a database connection.")
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self.connect()
+                if self._healthy(conn, time.monotonic()):
+                    return conn
+                conn.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard=False):
+        try:
+            now = time.monotonic()
+            if not discard:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                except sqlite3.Error:
+                    discard = True
+            conn.pending_events = []
+            if discard or self._expired(conn, now):
+                conn.close()
+                return
+            conn.last_used = now
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+db_pool = ConnectionPool(
+    DATABASE_PATH,
+    size=DB_POOL_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    max_lifetime=DB_POOL_MAX_LIFETIME,
+    check_interval=DB_POOL_CHECK_INTERVAL,
+    pragmas=resolve_pragmas(DATABASE_PRAGMA_PROFILE, DATABASE_PRAGMAS),
+)
 
 
 def get_db():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    if "db" not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exc=None):
+    conn = g.pop("db", None)
+    if conn is not None:
+        db_pool.release(conn, discard=isinstance(exc, sqlite3.Error))
+
+
+# Optional group commit for task mutations. A single writer thread with its
+# own connection collects write jobs for up to WRITE_BATCH_MS, runs each in a
+# savepoint and commits them together, so concurrent writers share one
+# transaction instead of queueing on SQLite's lock. A job is a function of the
+# connection; a failing job, or one returning None, is rolled back alone,
+# events it logged included. The rest are published after the commit.
+class GroupCommitWriter:
+    def __init__(self, pool: ConnectionPool, window: float, max_batch: int):
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self._jobs = queue.Queue()
+        self._conn = None
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, write) -> Future:
+        future = Future()
+        self._jobs.put((write, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._jobs.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._jobs.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            batch = [job for job in batch if job[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as exc:
+                # Whatever went wrong, no job may be left waiting on its future.
+                app.logger.exception("Group commit failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _commit(self, batch):
+        done = []
+        publishing = False
+        try:
+            if self._conn is None:
+                self._conn = self.pool.connect()
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            for write, future in batch:
+                conn.execute("SAVEPOINT job")
+                logged = len(conn.pending_events)
+                try:
+                    result = write(conn)
+                except Exception as exc:
+                    result = None
+                    future.set_exception(exc)
+                else:
+                    done.append((future, result))
+                if result is None:
+                    conn.execute("ROLLBACK TO job")
+                    del conn.pending_events[logged:]
+                conn.execute("RELEASE job")
+            # The jobs' events go out from here, after the group commit, even
+            # if the requests that submitted them have stopped waiting.
+            publishing = True
+            commit_events(conn)
+        except Exception as exc:
+            if publishing and not self._conn.in_transaction:
+                # The batch is committed; only handing its events on failed.
+                app.logger.exception("Publishing group commit events failed")
+            else:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+        for future, result in done:
+            future.set_result(result)
+
+
+group_writer = (
+    GroupCommitWriter(db_pool, WRITE_BATCH_MS / 1000, WRITE_BATCH_SIZE)
+    if WRITE_BATCH_MS > 0
+    else None
+)
+
+
+# Runs a write job and commits it, through the group writer when enabled.
+def run_write(write):
+    if group_writer is None:
+        conn = get_db()
+        result = write(conn)
+        if result is None:
+            conn.rollback()
+            conn.pending_events = []
+        else:
+            commit_events(conn)
+        return result
+    future = group_writer.submit(write)
+    try:
+        return future.result(timeout=DB_POOL_TIMEOUT)
+    except TimeoutError as exc:
+        if future.cancel():
+            raise PoolTimeout("Timed out waiting for the write queue.") from exc
+    # Already running: it commits with its batch whatever happens here, so
+    # report the outcome rather than a 503 that invites a retry.
+    return future.result()
+
+
+# Sort key for the task list: due tasks by datetime, undated ones last. Kept as
+# a virtual generated column so the ordering can be served by an index walk.
+DUE_KEY_EXPR = (
+    "COALESCE(datetime(due_date), "
+    "CASE WHEN due_date IS NULL THEN '9999-12-31 23:59:59' ELSE '' END)"
+)
 
 
 def init_db():
-    conn = get_db()
+    conn = db_pool.acquire()
+    try:
+        _create_schema(conn)
+    finally:
+        db_pool.release(conn)
+
+
+def _create_schema(conn):
     cur = conn.cursor()
     cur.executescript(
         """
@@ -64,49 +389,983 @@ def init_db():
         """
     )
     # Ensure columns exist for existing DBs.
-    task_cols = {row[1] for row in cur.execute("PRAGMA table_info(tasks)").fetchall()}
+    task_cols = {row[1] for row in cur.execute("PRAGMA table_xinfo(tasks)").fetchall()}
     if "due_date" not in task_cols:
         cur.execute("ALTER TABLE tasks ADD COLUMN due_date TEXT")
+    if "version" not in task_cols:
+        cur.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    if "due_key" not in task_cols:
+        cur.execute(
+            f"ALTER TABLE tasks ADD COLUMN due_key TEXT GENERATED ALWAYS AS ({DUE_KEY_EXPR}) VIRTUAL"
+        )
     user_cols = {row[1] for row in cur.execute("PRAGMA table_info(users)").fetchall()}
     if "is_admin" not in user_cols:
         cur.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
+    cur.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_order
+            ON tasks (due_key ASC, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_tasks_assigned_user
+            ON tasks (assigned_user_id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_version ON tasks (version);
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            task_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL,
+            deleted_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_tombstones_version
+            ON task_tombstones (version);
+        CREATE TABLE IF NOT EXISTS user_tombstones (
+            user_id INTEGER PRIMARY KEY,
+            deleted_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            data TEXT NOT NULL,
+            user_ids TEXT NOT NULL DEFAULT '[]',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO sync_state (id, version) VALUES (1, 0);
+        """
+    )
+    event_cols = {row[1] for row in cur.execute("PRAGMA table_info(events)").fetchall()}
+    if "user_ids" not in event_cols:
+        cur.execute("ALTER TABLE events ADD COLUMN user_ids TEXT NOT NULL DEFAULT '[]'")
     conn.commit()
-    conn.close()
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Too many attempts.")
+        self.retry_after = retry_after
+
+
+def hash_mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+# Password hashing is deliberately slow, so it runs in a small process pool
+# (outside the GIL) with a cap on in-flight jobs; past the cap requests are
+# turned away immediately instead of queueing behind a login storm.
+# HASH_WORKERS=0 hashes inline on the request thread.
+class PasswordHasher:
+    def __init__(self, method: str, workers: int, queue_limit: int, timeout: float):
+        # Normalise e.g. "pbkdf2" to "pbkdf2:sha256:600000", the prefix werkzeug
+        # stores, so stored hashes can be compared against it. Also rejects a
+        # bad PASSWORD_HASH_METHOD at startup.
+        self.method = generate_password_hash("", method).split("$", 1)[0]
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # Not fork: this process has pool, bus and writer threads,
+                # possibly holding locks, that a forked child would inherit.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=hash_mp_context()
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy("Too many logins in progress.")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError as exc:
+            raise HashingBusy("Timed out hashing a password.") from exc
+        except BrokenProcessPool as exc:
+            self._reset_executor()
+            raise HashingBusy("Password hashing workers failed.") from exc
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    # True for hashes made with a different algorithm or work factor than the
+    # configured one; they are upgraded on the user's next successful login.
+    def needs_rehash(self, pwhash: str) -> bool:
+        return pwhash.split("$", 1)[0] != self.method
+
+    def check(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+
+# Sliding-window attempt counter per key ("ip:..." / "user:..."), checked
+# before any hashing is done.
+class LoginThrottle:
+    def __init__(self, max_attempts: int, window: float, max_keys: int = 10000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self._attempts: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, *keys):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._attempts) > self.max_keys:
+                self._sweep(now)
+            for key in keys:
+                attempts = self._attempts.get(key)
+                if attempts is None:
+                    continue
+                while attempts and attempts[0] <= now - self.window:
+                    attempts.popleft()
+                if len(attempts) >= self.max_attempts:
+                    raise LoginThrottled(attempts[0] + self.window - now)
+            for key in keys:
+                self._attempts.setdefault(key, deque()).append(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def _sweep(self, now):
+        cutoff = now - self.window
+        for key in [k for k, v in self._attempts.items() if not v or v[-1] <= cutoff]:
+            del self._attempts[key]
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_METHOD, HASH_WORKERS, HASH_QUEUE_LIMIT, HASH_TIMEOUT
+)
+login_throttle = LoginThrottle(LOGIN_MAX_ATTEMPTS, LOGIN_WINDOW)
 
 
 def login_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        if not session.get("user_id"):
+        if bearer_token() is not None:
+            if g.user is None:
+                return jsonify({"error": "Unauthorized"}), 401
+        elif not session.get("user_id"):
             return jsonify({"error": "Unauthorized"}), 401
         return fn(*args, **kwargs)
 
     return wrapper
 
 
-@app.before_request
+# Serialized bodies of the list endpoints, keyed by path and query string and
+# valid for one data version; a newer version drops everything. The version
+# moves with every committed write in any worker, within EVENT_POLL_INTERVAL
+# under either backend (see DataVersion), so there is nothing else to
+# invalidate. Capped in bytes, evicting the oldest first.
+class ResponseCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: dict[str, bytes] = {}
+        self._size = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: int) -> bytes | None:
+        with self._lock:
+            if version != self._version:
+                return None
+            return self._entries.get(key)
+
+    def set(self, key: str, version: int, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                if self._version is not None and version < self._version:
+                    return
+                self._clear()
+                self._version = version
+            self._size += len(body) - len(self._entries.pop(key, b""))
+            self._entries[key] = body
+            while self._size > self.max_bytes:
+                self._size -= len(self._entries.pop(next(iter(self._entries))))
+
+    def _clear(self):
+        self._entries.clear()
+        self._size = 0
+        self._version = None
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+
+
+# Conditional GETs and the response cache for the list endpoints. The data
+# version is taken before the view reads anything, so a response is never
+# tagged newer than its contents; a matching If-None-Match gets a 304 and a
+# cached body is sent as is, neither running the view.
+def versioned_response(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        version = data_version.current()
+        body = response_cache.get(request.full_path, version)
+        if request.if_none_match.contains(f"v{version}"):
+            response = Response(status=304)
+        elif body is not None:
+            response = Response(body, mimetype="application/json")
+        else:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            # A body read across a commit may predate it; only keep it if
+            # no newer version has been seen meanwhile.
+            if data_version.value == version:
+                response_cache.set(request.full_path, version, response.get_data())
+        response.set_etag(f"v{version}")
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return wrapper
+
+
+# id -> {"id", "username"} (or None for a deleted user). Entries are dropped on
+# register/delete here and when other workers' user events arrive over the
+# event bus; the TTL bounds staleness if such an event is missed.
+class UserCache:
+    MISSING = object()
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return self.MISSING
+        return entry[0]
+
+    def set(self, user_id, user):
+        with self._lock:
+            if user_id not in self._entries and len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_SIZE)
+
+
 def load_logged_in_user():
+    token = bearer_token()
+    if token is not None:
+        return verify_api_token(token)
     user_id = session.get("user_id")
-    g.user = None
-    if user_id is not None:
-        conn = get_db()
-        user = conn.execute(
+    if user_id is None:
+        return None
+    return cached_user(get_db(), user_id)
+
+
+def cached_user(conn, user_id):
+    user = user_cache.get(user_id)
+    if user is UserCache.MISSING:
+        row = conn.execute(
             "SELECT id, username FROM users WHERE id = ?", (user_id,)
         ).fetchone()
-        conn.close()
-        g.user = user
+        user = {"id": row["id"], "username": row["username"]} if row else None
+        user_cache.set(user_id, user)
+    return user
+
+
+# Accounts deleted within the last API_TOKEN_TTL, whose tokens would otherwise
+# still verify. Loaded once per process from user_tombstones, then kept
+# current by user_deleted events; other workers' arrive through the event log
+# tail, which runs under either backend.
+class DeletedUsers:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._deleted_at: dict[int, float] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        event_bus.start()
+        conn = db_pool.acquire()
+        try:
+            rows = conn.execute(
+                "SELECT user_id, deleted_at FROM user_tombstones WHERE deleted_at > ?",
+                (time.time() - self.ttl,),
+            ).fetchall()
+        finally:
+            db_pool.release(conn)
+        with self._lock:
+            if self._deleted_at is None:
+                self._deleted_at = {}
+            for row in rows:
+                self._deleted_at.setdefault(row["user_id"], row["deleted_at"])
+
+    def add(self, user_id: int, deleted_at: float | None = None):
+        with self._lock:
+            if self._deleted_at is not None:
+                self._deleted_at[user_id] = deleted_at or time.time()
+
+    # Drops what is known so the next check reloads from user_tombstones.
+    def forget(self):
+        with self._lock:
+            self._deleted_at = None
+
+    def __contains__(self, user_id) -> bool:
+        known = self._deleted_at
+        while known is None:
+            self._load()
+            known = self._deleted_at
+        deleted_at = known.get(user_id)
+        if deleted_at is None:
+            return False
+        if deleted_at < time.time() - self.ttl:
+            # Any token issued before the deletion has expired by now.
+            with self._lock:
+                self._deleted_at.pop(user_id, None)
+            return False
+        return True
+
+
+deleted_users = DeletedUsers(API_TOKEN_TTL)
+
+
+# API tokens for scripts and integrations: the user's id and name, signed
+# with the app secret and timestamped. Verifying one needs no database; the
+# only revocation is expiry, a rotated SECRET_KEY, or deleting the account.
+def api_token_serializer():
+    return URLSafeTimedSerializer(app.secret_key, salt="api-token")
+
+
+def issue_api_token(user) -> str:
+    return api_token_serializer().dumps({"uid": user["id"], "name": user["username"]})
+
+
+def verify_api_token(token: str):
+    try:
+        claims = api_token_serializer().loads(token, max_age=API_TOKEN_TTL)
+    except BadSignature:
+        return None
+    if claims["uid"] in deleted_users:
+        return None
+    return {"id": claims["uid"], "username": claims["name"]}
+
+
+def bearer_token() -> str | None:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+def current_user_id():
+    if bearer_token() is not None:
+        return g.user["id"] if g.user else None
+    return session.get("user_id")
 
 
-def broadcast_event(kind: str, message: str, payload=None):
+# g.user is resolved on first access rather than before every request, so
+# static files and other routes that never look at it skip the lookup.
+class AppGlobals(_AppCtxGlobals):
+    def __getattr__(self, name):
+        if name == "user":
+            self.user = load_logged_in_user()
+            return self.user
+        return super().__getattr__(name)
+
+
+app.app_ctx_globals_class = AppGlobals
+
+
+def encode_frame(data: str, event: str | None = None, event_id: int | None = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+PING_FRAME = encode_frame("{}", event="ping")
+RESYNC_FRAME = encode_frame("{}", event="resync")
+OVERFLOW_POLICIES = ("drop_oldest", "resync", "disconnect")
+TASK_EVENT_TYPES = frozenset(
+    {"created", "completed", "reopened", "assigned", "updated", "deleted", "bulk"}
+)
+
+
+def parse_subscription(get_arg, user_id) -> dict:
+    types = {t.strip() for t in (get_arg("types") or "").split(",") if t.strip()}
+    return {
+        "user_id": user_id,
+        "types": frozenset(types) or None,
+        "assigned_only": get_arg("assigned") == "me",
+    }
+
+
+# One per connected /api/events client. The queue is bounded so a stalled
+# browser can't grow server memory; what happens on overflow is the policy:
+#   drop_oldest - discard the oldest queued frame to make room
+#   resync      - discard everything queued and tell the client to refetch
+#   disconnect  - end the stream; the browser reconnects and refetches
+class EventListener:
+    Full = queue.Full
+    Empty = queue.Empty
+
+    def __init__(
+        self,
+        user_id=None,
+        types=None,
+        assigned_only=False,
+        maxsize=EVENT_QUEUE_SIZE,
+        policy=EVENT_OVERFLOW_POLICY,
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown EVENT_OVERFLOW_POLICY {policy!r}")
+        self.user_id = user_id
+        self.types = types
+        self.assigned_only = assigned_only
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self.overflows = 0
+        self.closed = False
+        # Highest event id already sent from the replay log. The listener is
+        # registered before the log is read, so live copies of those events
+        # may also be queued; they are skipped on the way out.
+        self.replayed_through = 0
+        self.connected_at = datetime.utcnow().isoformat() + "Z"
+        self._overflow_lock = threading.Lock()
+
+    # Subscription filter, checked before anything is queued. "assigned only"
+    # narrows task events to ones touching the listener's user (including a
+    # task being reassigned away from them); user events always pass it.
+    # kind may list several comma-separated kinds (an event standing in for
+    # others); it is accepted if any of them is.
+    def accepts(self, kind: str | None, user_ids=frozenset()) -> bool:
+        if kind is None:
+            return True
+        kinds = kind.split(",")
+        if self.types is not None and self.types.isdisjoint(kinds):
+            return False
+        if self.assigned_only and not TASK_EVENT_TYPES.isdisjoint(kinds):
+            return self.user_id in user_ids
+        return True
+
+    def put(self, frame: bytes, event_id: int | None = None):
+        if self.closed:
+            return
+        item = (event_id, frame)
+        try:
+            self.queue.put_nowait(item)
+            return
+        except self.Full:
+            pass
+        with self._overflow_lock:
+            self.overflows += 1
+            if self.policy == "drop_oldest":
+                self.dropped += self._drain(1)
+                try:
+                    self.queue.put_nowait(item)
+                except self.Full:
+                    self.dropped += 1
+                return
+            self.dropped += self._drain() + 1
+            if self.policy == "resync":
+                self.queue.put_nowait((None, RESYNC_FRAME))
+            else:
+                self.closed = True
+                self.queue.put_nowait(None)
+
+    def _drain(self, limit=None) -> int:
+        drained = 0
+        while limit is None or drained < limit:
+            try:
+                self.queue.get_nowait()
+            except self.Empty:
+                break
+            drained += 1
+        return drained
+
+    # Keepalives never trigger the overflow policy: a full queue already has
+    # data on its way to the client.
+    def ping(self):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait((None, PING_FRAME))
+        except self.Full:
+            pass
+
+    def is_stale(self, item) -> bool:
+        return item is not None and item[0] is not None and item[0] <= self.replayed_through
+
+    # Returns the next frame to send, or None once the stream should end.
+    def get(self):
+        item = self.queue.get()
+        while self.is_stale(item):
+            item = self.queue.get()
+        return None if item is None else item[1]
+
+
+# Copy-on-write and sharded: each shard holds an immutable tuple that is
+# replaced under the shard's lock on connect/disconnect, so broadcasting
+# iterates the current tuples without any lock, and a connect only copies
+# and contends on one shard.
+class ListenerRegistry:
+    def __init__(self, shards: int = 16):
+        self._shards: list[tuple[EventListener, ...]] = [() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _index(self, listener) -> int:
+        return hash(listener) % len(self._shards)
+
+    def add(self, listener: EventListener):
+        i = self._index(listener)
+        with self._locks[i]:
+            self._shards[i] = self._shards[i] + (listener,)
+
+    def remove(self, listener: EventListener):
+        i = self._index(listener)
+        with self._locks[i]:
+            self._shards[i] = tuple(l for l in self._shards[i] if l is not listener)
+
+    def shards(self) -> list[tuple[EventListener, ...]]:
+        return list(self._shards)
+
+    def __iter__(self):
+        for shard in self.shards():
+            yield from shard
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+
+event_listeners = ListenerRegistry()
+
+
+# Appends an event to the replay log inside the caller's transaction, keeping
+# only the newest EVENT_LOG_SIZE rows; commit_events() publishes it once that
+# transaction commits. user_ids are the users an event concerns (the task's
+# assignee before and after the change, or the user itself); "assigned to me"
+# filters use them, as "types=" filters use the kind plus any it covers.
+def log_event(conn, kind: str, message: str, payload=None, user_ids=(), covers=()):
+    user_ids = frozenset(u for u in user_ids if u is not None)
     event = {
         "type": kind,
         "message": message,
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "payload": payload or {},
     }
-    with listeners_lock:
-        for q in list(event_queues):
-            q.put(event)
+    data = json.dumps(event, separators=(",", ":"))
+    # Kinds an event stands in for are listed after its own; see accepts().
+    kind = ",".join([kind, *sorted(set(covers) - {kind})])
+    event_id = conn.execute(
+        "INSERT INTO events (kind, data, user_ids) VALUES (?, ?, ?)",
+        (kind, data, json.dumps(sorted(user_ids))),
+    ).lastrowid
+    conn.execute("DELETE FROM events WHERE id <= ?", (event_id - EVENT_LOG_SIZE,))
+    conn.pending_events.append(LoggedEvent(event_id, data, kind, user_ids))
+
+
+def commit_events(conn):
+    # Writers commit one at a time, so event ids are in commit order; holding
+    # the lock through publishing keeps listeners seeing them in that order.
+    with broadcast_lock:
+        conn.commit()
+        events, conn.pending_events = conn.pending_events, []
+        for event in events:
+            # Don't wait for the bus (a poll, under sqlite) to retire this
+            # worker's cached responses.
+            data_version.advance(event.id)
+            event_bus.publish(event.id, event.data, event.kind, event.user_ids)
+
+
+def replay_frames(conn, last_event_id: int, listener: EventListener) -> tuple[list[bytes], int]:
+    oldest, newest = conn.execute("SELECT MIN(id), MAX(id) FROM events").fetchone()
+    if oldest is None:
+        return [], last_event_id
+    if last_event_id < oldest - 1:
+        # Part of what the client missed has been pruned from the log.
+        return [encode_frame("{}", event="resync", event_id=newest)], newest
+    rows = conn.execute(
+        "SELECT id, kind, data, user_ids FROM events WHERE id > ? ORDER BY id",
+        (last_event_id,),
+    ).fetchall()
+    frames = [
+        encode_frame(r["data"], event_id=r["id"])
+        for r in rows
+        if listener.accepts(r["kind"], frozenset(json.loads(r["user_ids"])))
+    ]
+    return frames, rows[-1]["id"] if rows else last_event_id
+
+
+def parse_last_event_id(value) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def register_listener(listener: EventListener, last_event_id: int | None = None):
+    event_bus.start()
+    heartbeat.start()
+    # Register before reading the log: anything committed afterwards arrives
+    # live, anything before is in the replay, and overlaps are dropped by id.
+    event_listeners.add(listener)
+    replay = []
+    if last_event_id is not None:
+        conn = db_pool.acquire()
+        try:
+            replay, listener.replayed_through = replay_frames(
+                conn, last_event_id, listener
+            )
+        finally:
+            db_pool.release(conn)
+    return replay
+
+
+def unregister_listener(listener: EventListener):
+    event_listeners.remove(listener)
+
+
+def fan_out(frame: bytes, event_id: int | None = None, kind=None, user_ids=frozenset()):
+    for listener in event_listeners:
+        if listener.accepts(kind, user_ids):
+            listener.put(frame, event_id)
+
+
+# Id of the newest event this process has seen. Every write logs an event in
+# its own transaction, and every worker tails the events table whatever the
+# backend, so this serves as a data version for conditional GETs without a
+# query; another worker's write is seen within EVENT_POLL_INTERVAL. The bus is
+# started on first use rather than left to the first SSE client, or a worker
+# without one would never see other workers' writes.
+class DataVersion:
+    def __init__(self):
+        self.value = None
+        self._lock = threading.Lock()
+
+    def advance(self, event_id: int):
+        with self._lock:
+            if self.value is None or event_id > self.value:
+                self.value = event_id
+
+    def current(self) -> int:
+        event_bus.start()
+        if self.value is None:
+            newest = get_db().execute("SELECT MAX(id) FROM events").fetchone()[0]
+            self.advance(newest or 0)
+        return self.value
+
+
+data_version = DataVersion()
+
+
+# Updates the per-process state that depends on other workers' writes: the
+# data version and what is known about users. Runs for every logged event,
+# whichever worker wrote it and whatever the backend.
+def observe(event_id: int, kind: str, user_ids: frozenset):
+    data_version.advance(event_id)
+    if kind == "user_created":
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+    elif kind == "user_deleted":
+        for user_id in user_ids:
+            user_cache.set(user_id, None)
+            deleted_users.add(user_id)
+
+
+# Hands a logged event to this process's listeners, either straight away or
+# through the coalescing window.
+def dispatch(event_id: int, data: str, kind: str, user_ids: frozenset):
+    observe(event_id, kind, user_ids)
+    if coalescer is not None:
+        coalescer.add(LoggedEvent(event_id, data, kind, user_ids))
+        return
+    # Encode once; every listener gets the same immutable bytes.
+    fan_out(encode_frame(data, event_id=event_id), event_id, kind, user_ids)
+
+
+LoggedEvent = namedtuple("LoggedEvent", "id data kind user_ids")
+
+
+def encode_batch(events: list[LoggedEvent], from_version, version) -> bytes:
+    # Splice the already-serialized events rather than re-encoding them.
+    head = json.dumps(
+        {
+            "type": "batch",
+            "message": f"{len(events)} updates",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        },
+        separators=(",", ":"),
+    )[:-1]
+    versions = json.dumps({"from_version": from_version, "version": version})[1:-1]
+    data = f'{head},"payload":{{"events":[{",".join(e.data for e in events)}],{versions}}}}}'
+    return encode_frame(data, event_id=events[-1].id)
+
+
+# Collects events for a short window, keeps only the latest event per task
+# (each carries the full task) and sends what is left as one "batch" frame.
+# Listeners with different filters get their own subset, encoded once per
+# distinct subset.
+class EventCoalescer:
+    def __init__(self, window_ms: float):
+        self.window = window_ms / 1000
+        self._pending: list[LoggedEvent] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def add(self, event: LoggedEvent):
+        with self._lock:
+            self._pending.append(event)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._timer = None
+            if pending:
+                self._deliver(*self._merge(pending))
+
+    @staticmethod
+    def _merge(pending):
+        merged: dict = {}
+        versions = []
+        for event in pending:
+            payload = json.loads(event.data).get("payload") or {}
+            if payload.get("version") is not None:
+                versions.append(payload["version"])
+            task_id = payload.get("task_id")
+            key = ("task", task_id) if task_id is not None else ("event", event.id)
+            previous = merged.pop(key, None)
+            if previous is not None:
+                # The survivor stands in for what it replaced, so filters on
+                # audience or type must still match the replaced events.
+                kinds = set(event.kind.split(",")) | set(previous.kind.split(","))
+                event = event._replace(
+                    kind=",".join(sorted(kinds)),
+                    user_ids=event.user_ids | previous.user_ids,
+                )
+            merged[key] = event
+        events = sorted(merged.values(), key=lambda e: e.id)
+        return events, min(versions, default=None), max(versions, default=None)
+
+    def _deliver(self, events, from_version, version):
+        frames: dict = {}
+        for listener in event_listeners:
+            selected = tuple(
+                e
+                for e in events
+                if e.id > listener.replayed_through and listener.accepts(e.kind, e.user_ids)
+            )
+            if not selected:
+                continue
+            frame = frames.get(selected)
+            if frame is None:
+                if len(selected) == 1:
+                    frame = encode_frame(selected[0].data, event_id=selected[0].id)
+                else:
+                    frame = encode_batch(list(selected), from_version, version)
+                frames[selected] = frame
+            listener.put(frame, selected[-1].id)
+
+
+coalescer = EventCoalescer(EVENT_COALESCE_MS) if EVENT_COALESCE_MS > 0 else None
+
+
+# Tails the shared events table. With deliver set, every worker's events are
+# dispatched to this worker's listeners (EVENT_BACKEND=sqlite); without it,
+# rows are only observed, which keeps the data version and user state current
+# across workers even when listeners hear only local events.
+class EventLogTail:
+    def __init__(self, pool: ConnectionPool, interval: float, deliver: bool):
+        self.pool = pool
+        self.interval = interval
+        self.deliver = deliver
+        self._last_id = 0
+        self._wake = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            conn = self.pool.acquire()
+            try:
+                self._last_id = conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM events"
+                ).fetchone()[0]
+            finally:
+                self.pool.release(conn)
+            # Events up to here are never dispatched; count them as seen.
+            data_version.advance(self._last_id)
+            threading.Thread(target=self._run, name="event-tail", daemon=True).start()
+            self._started = True
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self._poll()
+            except (sqlite3.Error, PoolTimeout):
+                app.logger.exception("Event log poll failed")
+
+    def _poll(self):
+        conn = self.pool.acquire()
+        try:
+            rows = conn.execute(
+                "SELECT id, kind, data, user_ids FROM events WHERE id > ? ORDER BY id",
+                (self._last_id,),
+            ).fetchall()
+        finally:
+            self.pool.release(conn)
+        if rows and rows[0]["id"] > self._last_id + 1:
+            # We fell further behind than the log retains, and may have missed
+            # user deletions along with everything else.
+            user_cache.clear()
+            deleted_users.forget()
+            if self.deliver:
+                fan_out(RESYNC_FRAME)
+        for row in rows:
+            user_ids = frozenset(json.loads(row["user_ids"]))
+            if self.deliver:
+                dispatch(row["id"], row["data"], row["kind"], user_ids)
+            else:
+                observe(row["id"], row["kind"], user_ids)
+            self._last_id = row["id"]
+
+
+# Delivers logged events to this process's listeners. The in-process bus fans
+# out directly, so it only reaches clients connected to the same worker, and
+# tails the log just to observe other workers' writes.
+class InProcessEventBus:
+    def __init__(self, pool: ConnectionPool, interval: float):
+        self.tail = EventLogTail(pool, interval, deliver=False)
+
+    def start(self):
+        self.tail.start()
+
+    def publish(self, event_id: int, data: str, kind: str, user_ids: frozenset):
+        dispatch(event_id, data, kind, user_ids)
+
+
+# For multi-worker deployments on one host: every worker tails the shared
+# events table, so a write in any worker reaches clients in all of them.
+# Publishing only wakes the local tail early.
+class SQLiteEventBus:
+    def __init__(self, pool: ConnectionPool, interval: float):
+        self.tail = EventLogTail(pool, interval, deliver=True)
+
+    def start(self):
+        self.tail.start()
+
+    def publish(self, event_id: int, data: str, kind: str, user_ids: frozenset):
+        self.tail.wake()
+
+
+# One ticker pings every listener, instead of each stream waking on its own
+# timeout. Jitter is a fraction of the interval, so replicas behind the same
+# load balancer don't all tick together.
+class Heartbeat:
+    def __init__(self, interval: float, jitter: float):
+        self.interval = interval
+        self.jitter = jitter
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            threading.Thread(target=self._run, name="sse-heartbeat", daemon=True).start()
+            self._started = True
+
+    def next_delay(self) -> float:
+        spread = self.interval * self.jitter
+        return max(0.1, self.interval + random.uniform(-spread, spread))
+
+    def _run(self):
+        while True:
+            time.sleep(self.next_delay())
+            for listener in event_listeners:
+                try:
+                    listener.ping()
+                except Exception:
+                    app.logger.exception("Heartbeat ping failed")
+
+
+heartbeat = Heartbeat(SSE_HEARTBEAT_INTERVAL, SSE_HEARTBEAT_JITTER)
+
+
+def create_event_bus(backend: str):
+    if backend == "memory":
+        return InProcessEventBus(db_pool, EVENT_POLL_INTERVAL)
+    if backend == "sqlite":
+        return SQLiteEventBus(db_pool, EVENT_POLL_INTERVAL)
+    raise ValueError(f"Unknown EVENT_BACKEND {backend!r}")
+
+
+event_bus = create_event_bus(EVENT_BACKEND)
+
+
+# Must be the first write of a transaction: it takes SQLite's write lock, so
+# versions are handed out in commit order and a reader that sees version N
+# also sees every change up to N.
+def next_version(conn) -> int:
+    return conn.execute(
+        "UPDATE sync_state SET version = version + 1 WHERE id = 1 RETURNING version"
+    ).fetchone()[0]
+
+
+def current_version(conn) -> int:
+    return conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0]
+
+
+def format_user(row):
+    return {
+        "id": row["id"],
+        "username": row["username"],
+        "created_at": row["created_at"],
+        "is_admin": bool(row["is_admin"]),
+    }
 
 
 def format_task(row):
@@ -122,6 +1381,55 @@ def format_task(row):
     }
 
 
+# Task writes take the assignee's name from the user cache instead of joining
+# users, so one INSERT/UPDATE ... RETURNING yields the whole response.
+def find_assignee(conn, user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return cached_user(conn, user_id)
+
+
+TASK_SELECT = """
+    SELECT tasks.*, users.username AS assigned_username
+    FROM tasks
+    LEFT JOIN users ON users.id = tasks.assigned_user_id
+"""
+TASK_ORDER = "ORDER BY tasks.due_key ASC, tasks.created_at DESC, tasks.id DESC"
+# Rows strictly after the cursor in TASK_ORDER. The leading range on due_key
+# lets SQLite seek into idx_tasks_due_order instead of scanning from the top.
+TASK_AFTER_CURSOR = """
+    WHERE tasks.due_key >= :due_key AND (
+        tasks.due_key > :due_key
+        OR (tasks.due_key = :due_key AND (
+            tasks.created_at < :created_at
+            OR (tasks.created_at = :created_at AND tasks.id < :id)
+        ))
+    )
+"""
+
+
+def encode_cursor(row) -> str:
+    raw = json.dumps([row["due_key"], row["created_at"], row["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        due_key, created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    if not (
+        isinstance(due_key, str)
+        and isinstance(created_at, str)
+        and isinstance(task_id, int)
+    ):
+        raise ValueError("Invalid cursor.")
+    return {"due_key": due_key, "created_at": created_at, "id": task_id}
+
+
 @app.route("/")
 def index():
     user_payload = (
@@ -138,24 +1446,54 @@ def register():
     if len(username) < 3 or len(password) < 4:
         return jsonify({"error": "Username or password too short."}), 400
 
+    login_throttle.hit(f"ip:{request.remote_addr}")
+    password_hash = password_hasher.hash(password)
     conn = get_db()
     try:
-        conn.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, generate_password_hash(password)),
-        )
-        conn.commit()
+        user = conn.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+            " RETURNING id, username, created_at, is_admin",
+            (username, password_hash),
+        ).fetchone()
     except sqlite3.IntegrityError:
-        conn.close()
         return jsonify({"error": "Username already taken."}), 400
+    log_event(
+        conn,
+        "user_created",
+        f'User "{user["username"]}" added',
+        {"user_id": user["id"], "user": format_user(user)},
+        user_ids=[user["id"]],
+    )
+    commit_events(conn)
 
+    session["user_id"] = user["id"]
+    user_cache.invalidate(user["id"])
+    return jsonify({"user": {"id": user["id"], "username": user["username"]}})
+
+
+def authenticate(username: str, password: str):
+    login_throttle.hit(f"ip:{request.remote_addr}", f"user:{username.lower()}")
+    conn = get_db()
     user = conn.execute(
-        "SELECT id, username FROM users WHERE username = ?", (username,)
+        "SELECT id, username, password_hash FROM users WHERE username = ?", (username,),
     ).fetchone()
-    conn.close()
+    # Don't hold a pooled connection while the hash is checked.
+    close_db()
 
-    session["user_id"] = user["id"]
-    return jsonify({"user": {"id": user["id"], "username": user["username"]}})
+    if user is None or not password_hasher.check(user["password_hash"], password):
+        return None
+
+    login_throttle.reset(f"user:{username.lower()}")
+    if password_hasher.needs_rehash(user["password_hash"]):
+        new_hash = password_hasher.hash(password)
+        conn = get_db()
+        # Compare-and-set, in case the password changed meanwhile.
+        conn.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+            (new_hash, user["id"], user["password_hash"]),
+        )
+        conn.commit()
+    return user
 
 
 @app.post("/auth/login")
@@ -164,19 +1502,33 @@ def login():
     username = (data.get("username") or "").strip()
     password = data.get("password") or ""
 
-    conn = get_db()
-    user = conn.execute(
-        "SELECT id, username, password_hash FROM users WHERE username = ?", (username,),
-    ).fetchone()
-    conn.close()
-
-    if user is None or not check_password_hash(user["password_hash"], password):
+    user = authenticate(username, password)
+    if user is None:
         return jsonify({"error": "Invalid credentials."}), 400
-
     session["user_id"] = user["id"]
     return jsonify({"user": {"id": user["id"], "username": user["username"]}})
 
 
+@app.post("/auth/token")
+def create_api_token():
+    # Either trade a browser session for a token, or authenticate directly.
+    user = g.user if session.get("user_id") else None
+    if user is None:
+        data = request.get_json(silent=True) or {}
+        user = authenticate(
+            (data.get("username") or "").strip(), data.get("password") or ""
+        )
+    if user is None:
+        return jsonify({"error": "Invalid credentials."}), 400
+    return jsonify(
+        {
+            "token": issue_api_token(user),
+            "token_type": "Bearer",
+            "expires_in": API_TOKEN_TTL,
+        }
+    )
+
+
 @app.post("/auth/logout")
 def logout():
     session.clear()
@@ -191,25 +1543,13 @@ def current_user():
 
 @app.get("/api/users")
 @login_required
+@versioned_response
 def list_users():
     conn = get_db()
     users = conn.execute(
-        "SELECT id, username, created_at FROM users ORDER BY created_at ASC"
+        "SELECT id, username, created_at, is_admin FROM users ORDER BY created_at ASC"
     ).fetchall()
-    conn.close()
-    return jsonify(
-        {
-            "users": [
-                {
-                    "id": u["id"],
-                    "username": u["username"],
-                    "created_at": u["created_at"],
-                    "is_admin": bool(u["is_admin"]),
-                }
-                for u in users
-            ]
-        }
-    )
+    return jsonify({"users": [format_user(u) for u in users]})
 
 
 @app.delete("/api/users/<int:user_id>")
@@ -220,40 +1560,102 @@ def delete_user(user_id: int):
         "SELECT id, username FROM users WHERE id = ?", (user_id,)
     ).fetchone()
     if user is None:
-        conn.close()
         return jsonify({"error": "User not found."}), 404
 
     # Unassign tasks owned by this user to keep history intact.
+    version = next_version(conn)
     conn.execute(
-        "UPDATE tasks SET assigned_user_id = NULL WHERE assigned_user_id = ?", (user_id,)
+        "UPDATE tasks SET assigned_user_id = NULL, version = ? WHERE assigned_user_id = ?",
+        (version, user_id),
     )
     conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    conn.commit()
-    conn.close()
+    # Kept for as long as a token issued before the deletion could still be
+    # presented, so workers started later refuse those tokens too.
+    deleted_at = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO user_tombstones (user_id, deleted_at) VALUES (?, ?)",
+        (user_id, deleted_at),
+    )
+    conn.execute(
+        "DELETE FROM user_tombstones WHERE deleted_at < ?", (deleted_at - API_TOKEN_TTL,)
+    )
+    log_event(
+        conn,
+        "user_deleted",
+        f'User "{user["username"]}" removed',
+        {"user_id": user_id, "version": version},
+        user_ids=[user_id],
+    )
+    commit_events(conn)
+    user_cache.set(user_id, None)
+    deleted_users.add(user_id, deleted_at)
 
     if session.get("user_id") == user_id:
         session.clear()
-    broadcast_event("user_deleted", f'User "{user["username"]}" removed', {"user_id": user_id})
     return jsonify({"ok": True})
 
 
 @app.get("/api/tasks")
 @login_required
+@versioned_response
 def get_tasks():
     conn = get_db()
+    since = request.args.get("since")
+    if since is not None:
+        return get_task_changes(conn, since)
+
+    limit = request.args.get("limit", type=int)
+    if limit is None and "limit" in request.args:
+        return jsonify({"error": "limit must be an integer."}), 400
+    cursor = request.args.get("cursor")
+    if limit is None and cursor is None:
+        # Read the version first: anything committed in between is re-sent
+        # on the client's next delta, never skipped.
+        version = current_version(conn)
+        rows = conn.execute(f"{TASK_SELECT} {TASK_ORDER}").fetchall()
+        return jsonify({"tasks": [format_task(r) for r in rows], "version": version})
+
+    limit = max(1, min(limit or TASK_PAGE_MAX, TASK_PAGE_MAX))
+    if cursor:
+        try:
+            params = decode_cursor(cursor)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        sql = f"{TASK_SELECT} {TASK_AFTER_CURSOR} {TASK_ORDER} LIMIT :limit"
+    else:
+        params = {}
+        sql = f"{TASK_SELECT} {TASK_ORDER} LIMIT :limit"
+    params["limit"] = limit + 1
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return jsonify(
+        {"tasks": [format_task(r) for r in rows[:limit]], "next_cursor": next_cursor}
+    )
+
+
+def get_task_changes(conn, since: str):
+    try:
+        since_version = int(since)
+    except ValueError:
+        return jsonify({"error": "Invalid version."}), 400
+
+    version = current_version(conn)
+    # Ordered by version so the range is an idx_tasks_version seek; sorting
+    # in TASK_ORDER walked the whole due-order index. Clients re-sort anyway.
     rows = conn.execute(
-        """
-        SELECT tasks.*, users.username AS assigned_username
-        FROM tasks
-        LEFT JOIN users ON users.id = tasks.assigned_user_id
-        ORDER BY
-          CASE WHEN tasks.due_date IS NULL THEN 1 ELSE 0 END,
-          datetime(tasks.due_date) ASC,
-          tasks.created_at DESC
-        """
+        f"{TASK_SELECT} WHERE tasks.version > ? ORDER BY tasks.version", (since_version,)
     ).fetchall()
-    conn.close()
-    return jsonify({"tasks": [format_task(r) for r in rows]})
+    deleted = conn.execute(
+        "SELECT task_id FROM task_tombstones WHERE version > ? ORDER BY version",
+        (since_version,),
+    ).fetchall()
+    return jsonify(
+        {
+            "tasks": [format_task(r) for r in rows],
+            "deleted": [r["task_id"] for r in deleted],
+            "version": version,
+        }
+    )
 
 
 @app.post("/api/tasks")
@@ -269,37 +1671,37 @@ def create_task():
 
     conn = get_db()
 
+    assignee = None
     if assigned_user_id:
-        user_exists = conn.execute(
-            "SELECT id FROM users WHERE id = ?", (assigned_user_id,)
-        ).fetchone()
-        if user_exists is None:
-            conn.close()
+        assignee = find_assignee(conn, assigned_user_id)
+        if assignee is None:
             return jsonify({"error": "Assigned user not found."}), 400
 
-    cur = conn.execute(
-        "INSERT INTO tasks (title, assigned_user_id, due_date) VALUES (?, ?, ?)",
-        (title, assigned_user_id, due_date),
-    )
-    conn.commit()
-    task_id = cur.lastrowid
-    row = conn.execute(
-        """
-        SELECT tasks.*, users.username AS assigned_username
-        FROM tasks
-        LEFT JOIN users ON users.id = tasks.assigned_user_id
-        WHERE tasks.id = ?
-        """,
-        (task_id,),
-    ).fetchone()
-    conn.close()
+    def write(conn):
+        version = next_version(conn)
+        row = conn.execute(
+            "INSERT INTO tasks (title, assigned_user_id, due_date, version)"
+            " VALUES (?, ?, ?, ?) RETURNING *",
+            (title, assigned_user_id, due_date, version),
+        ).fetchone()
+        task = format_task(
+            {**row, "assigned_username": assignee["username"] if assignee else None}
+        )
+        log_event(
+            conn,
+            "created",
+            f'"{title}" added',
+            {
+                "task_id": row["id"],
+                "assigned_user_id": assigned_user_id,
+                "task": task,
+                "version": version,
+            },
+            user_ids=[row["assigned_user_id"]],
+        )
+        return task
 
-    broadcast_event(
-        "created",
-        f'"{title}" added',
-        {"task_id": task_id, "assigned_user_id": assigned_user_id},
-    )
-    return jsonify({"task": format_task(row)})
+    return jsonify({"task": run_write(write)})
 
 
 @app.patch("/api/tasks/<int:task_id>")
@@ -311,12 +1713,6 @@ def update_task(task_id: int):
     assigned_user_id = data.get("assigned_user_id")
     due_date = data.get("due_date")
 
-    conn = get_db()
-    row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-    if row is None:
-        conn.close()
-        return jsonify({"error": "Task not found."}), 404
-
     updates = []
     params = []
 
@@ -331,16 +1727,13 @@ def update_task(task_id: int):
         updates.append("completed_at = ?")
         params.append(datetime.utcnow().isoformat() + "Z" if completed else None)
 
-    if assigned_user_id is not None:
+    conn = get_db()
+    reassigning = assigned_user_id is not None
+    if reassigning:
         if assigned_user_id == "":
             assigned_user_id = None
-        else:
-            assigned_exists = conn.execute(
-                "SELECT id FROM users WHERE id = ?", (assigned_user_id,)
-            ).fetchone()
-            if assigned_exists is None:
-                conn.close()
-                return jsonify({"error": "Assigned user not found."}), 400
+        elif find_assignee(conn, assigned_user_id) is None:
+            return jsonify({"error": "Assigned user not found."}), 400
         updates.append("assigned_user_id = ?")
         params.append(assigned_user_id)
 
@@ -350,86 +1743,352 @@ def update_task(task_id: int):
         params.append(due_val or None)
 
     if not updates:
-        conn.close()
         return jsonify({"error": "Nothing to update."}), 400
 
-    params.append(task_id)
-    conn.execute(f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?", params)
-    conn.commit()
+    updates.append("version = ?")
+    sql = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ? RETURNING *"
+
+    def write(conn):
+        # The previous assignee is only needed, for the event audience, when
+        # the assignment changes; otherwise it is the same as the updated row's.
+        # The version bump comes first so the read happens under the write lock.
+        version = next_version(conn)
+        previous = None
+        if reassigning:
+            previous = conn.execute(
+                "SELECT assigned_user_id FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+            if previous is None:
+                return None
+        updated = conn.execute(sql, [*params, version, task_id]).fetchone()
+        if updated is None:
+            return None
+        assignee = find_assignee(conn, updated["assigned_user_id"])
+        updated = {
+            **updated,
+            "assigned_username": assignee["username"] if assignee else None,
+        }
 
-    updated = conn.execute(
-        """
-        SELECT tasks.*, users.username AS assigned_username
-        FROM tasks
-        LEFT JOIN users ON users.id = tasks.assigned_user_id
-        WHERE tasks.id = ?
-        """,
-        (task_id,),
-    ).fetchone()
-    conn.close()
+        # Every event carries the full task so clients can apply it without a
+        # refetch; a task changed only in title or due date gets an "updated".
+        task = format_task(updated)
+        audience = [(previous or updated)["assigned_user_id"], updated["assigned_user_id"]]
+        if completed is not None:
+            log_event(
+                conn,
+                "completed" if completed else "reopened",
+                f'"{updated["title"]}" {"completed" if completed else "reopened"}',
+                {"task_id": task_id, "task": task, "version": version},
+                user_ids=audience,
+            )
+        if assigned_user_id is not None:
+            log_event(
+                conn,
+                "assigned",
+                f'"{updated["title"]}" assigned',
+                {
+                    "task_id": task_id,
+                    "assigned_user_id": assigned_user_id,
+                    "assigned_username": updated["assigned_username"],
+                    "task": task,
+                    "version": version,
+                },
+                user_ids=audience,
+            )
+        if completed is None and assigned_user_id is None:
+            log_event(
+                conn,
+                "updated",
+                f'"{updated["title"]}" updated',
+                {"task_id": task_id, "task": task, "version": version},
+                user_ids=audience,
+            )
+        return task
+
+    task = run_write(write)
+    if task is None:
+        return jsonify({"error": "Task not found."}), 404
+    return jsonify({"task": task})
 
-    if completed is not None:
-        broadcast_event(
-            "completed" if completed else "reopened",
-            f'"{updated["title"]}" {"completed" if completed else "reopened"}',
-            {"task_id": task_id},
+
+@app.delete("/api/tasks/<int:task_id>")
+@login_required
+def delete_task(task_id: int):
+    def write(conn):
+        # One statement both checks and deletes, so two concurrent deletes
+        # can't both succeed.
+        version = next_version(conn)
+        row = conn.execute(
+            "DELETE FROM tasks WHERE id = ? RETURNING title, assigned_user_id",
+            (task_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "INSERT OR REPLACE INTO task_tombstones (task_id, version) VALUES (?, ?)",
+            (task_id, version),
         )
-    if assigned_user_id is not None:
-        broadcast_event(
-            "assigned",
-            f'"{updated["title"]}" assigned',
-            {
-                "task_id": task_id,
-                "assigned_user_id": assigned_user_id,
-                "assigned_username": updated["assigned_username"],
-            },
+        log_event(
+            conn,
+            "deleted",
+            f'"{row["title"]}" removed',
+            {"task_id": task_id, "version": version},
+            user_ids=[row["assigned_user_id"]],
         )
+        return True
 
-    return jsonify({"task": format_task(updated)})
+    if run_write(write) is None:
+        return jsonify({"error": "Task not found."}), 404
+    return jsonify({"ok": True})
 
 
-@app.delete("/api/tasks/<int:task_id>")
+# Field changes for a batch "update" item, in the same terms as update_task.
+def batch_task_changes(conn, item: dict, now: str):
+    changes = {}
+    if item.get("title") is not None:
+        changes["title"] = str(item["title"]).strip()
+    if item.get("completed") is not None:
+        changes["completed"] = 1 if item["completed"] else 0
+        changes["completed_at"] = now if item["completed"] else None
+    assigned_user_id = item.get("assigned_user_id")
+    if assigned_user_id == "":
+        changes["assigned_user_id"] = None
+    elif assigned_user_id is not None:
+        assignee = find_assignee(conn, assigned_user_id)
+        if assignee is None:
+            return None, "Assigned user not found."
+        changes["assigned_user_id"] = assignee["id"]
+    due_date = item.get("due_date")
+    if due_date is not None:
+        changes["due_date"] = (due_date.strip() if isinstance(due_date, str) else None) or None
+    if not changes:
+        return None, "Nothing to update."
+    return changes, None
+
+
+# Applies a list of create/update/delete operations in one transaction under
+# one version, and announces them as a single "bulk" event. Invalid items are
+# reported in their result slot and skipped; the rest still apply.
+@app.post("/api/tasks/batch")
 @login_required
-def delete_task(task_id: int):
+def batch_tasks():
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations must be a non-empty list."}), 400
+    if len(operations) > TASK_BATCH_MAX:
+        return jsonify({"error": f"At most {TASK_BATCH_MAX} operations per batch."}), 400
+
     conn = get_db()
-    row = conn.execute("SELECT title FROM tasks WHERE id = ?", (task_id,)).fetchone()
-    if row is None:
-        conn.close()
-        return jsonify({"error": "Task not found."}), 404
-    conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    conn.close()
+    # Take the write lock before reading anything the batch depends on, so
+    # no other writer can delete a listed task between the check and the
+    # UPDATE. The version is rolled back if nothing turns out to apply.
+    version = next_version(conn)
+    ids = []
+    for item in operations:
+        if isinstance(item, dict) and item.get("op") in ("update", "delete"):
+            try:
+                ids.append(int(item.get("id")))
+            except (TypeError, ValueError):
+                pass
+    existing = {
+        row["id"]: row
+        for row in conn.execute(
+            "SELECT id, assigned_user_id FROM tasks"
+            " WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids),),
+        )
+    }
 
-    broadcast_event("deleted", f'"{row["title"]}" removed', {"task_id": task_id})
-    return jsonify({"ok": True})
+    now = datetime.utcnow().isoformat() + "Z"
+    results = [None] * len(operations)
+    creates = []  # (index, title, assigned_user_id, due_date)
+    updates = {}  # sorted columns -> [(index, task_id, values)]
+    deletes = []  # (index, task_id)
+    seen = set()
+    # The kinds the single-task routes would have sent, so "types=" filters
+    # still see what a bulk event contains.
+    kinds = set()
+    for index, item in enumerate(operations):
+        op = item.get("op") if isinstance(item, dict) else None
+        if op == "create":
+            title = str(item.get("title") or "").strip()
+            if not title:
+                results[index] = {"ok": False, "error": "Title is required."}
+                continue
+            assignee = None
+            if item.get("assigned_user_id"):
+                assignee = find_assignee(conn, item["assigned_user_id"])
+                if assignee is None:
+                    results[index] = {"ok": False, "error": "Assigned user not found."}
+                    continue
+            due_date = item.get("due_date")
+            due_date = (due_date.strip() if isinstance(due_date, str) else None) or None
+            creates.append((index, title, assignee["id"] if assignee else None, due_date))
+            kinds.add("created")
+            continue
+        if op not in ("update", "delete"):
+            results[index] = {"ok": False, "error": "op must be create, update or delete."}
+            continue
+        try:
+            task_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            task_id = None
+        if task_id not in existing:
+            results[index] = {"ok": False, "error": "Task not found."}
+            continue
+        if task_id in seen:
+            results[index] = {"ok": False, "error": "Task appears more than once."}
+            continue
+        if op == "delete":
+            seen.add(task_id)
+            deletes.append((index, task_id))
+            kinds.add("deleted")
+            continue
+        changes, error = batch_task_changes(conn, item, now)
+        if error:
+            results[index] = {"ok": False, "error": error}
+            continue
+        seen.add(task_id)
+        if "completed" in changes:
+            kinds.add("completed" if changes["completed"] else "reopened")
+        if changes.get("assigned_user_id") is not None:
+            kinds.add("assigned")
+        if "completed" not in changes and changes.get("assigned_user_id") is None:
+            kinds.add("updated")
+        columns = tuple(sorted(changes))
+        updates.setdefault(columns, []).append(
+            (index, task_id, [changes[c] for c in columns])
+        )
+
+    if not (creates or updates or deletes):
+        conn.rollback()
+        return jsonify({"results": results, "version": current_version(conn)})
+
+    if creates:
+        conn.executemany(
+            "INSERT INTO tasks (title, assigned_user_id, due_date, version) VALUES (?, ?, ?, ?)",
+            [(title, user_id, due, version) for _, title, user_id, due in creates],
+        )
+        # AUTOINCREMENT ids are handed out in insertion order, and nothing else
+        # carries this version yet.
+        created_ids = [
+            row["id"]
+            for row in conn.execute(
+                "SELECT id FROM tasks WHERE version = ? ORDER BY id", (version,)
+            )
+        ]
+    for columns, rows in updates.items():
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        conn.executemany(
+            f"UPDATE tasks SET {assignments}, version = ? WHERE id = ?",
+            [(*values, version, task_id) for _, task_id, values in rows],
+        )
+    if deletes:
+        conn.executemany(
+            "DELETE FROM tasks WHERE id = ?", [(task_id,) for _, task_id in deletes]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO task_tombstones (task_id, version) VALUES (?, ?)",
+            [(task_id, version) for _, task_id in deletes],
+        )
+    changed = {
+        row["id"]: format_task(row)
+        for row in conn.execute(f"{TASK_SELECT} WHERE tasks.version = ?", (version,))
+    }
+    deleted_ids = [task_id for _, task_id in deletes]
+    audience = [existing[task_id]["assigned_user_id"] for task_id in seen]
+    audience += [task["assigned_user_id"] for task in changed.values()]
+    log_event(
+        conn,
+        "bulk",
+        f"{len(changed) + len(deleted_ids)} tasks changed",
+        {"tasks": list(changed.values()), "deleted": deleted_ids, "version": version},
+        user_ids=audience,
+        covers=kinds,
+    )
+    commit_events(conn)
+
+    if creates:
+        for (index, *_), task_id in zip(creates, created_ids):
+            results[index] = {"ok": True, "task": changed[task_id]}
+    for rows in updates.values():
+        for index, task_id, _ in rows:
+            results[index] = {"ok": True, "task": changed[task_id]}
+    for index, task_id in deletes:
+        results[index] = {"ok": True, "id": task_id}
+    return jsonify({"results": results, "version": version})
 
 
 @app.get("/api/events")
 @login_required
 def events():
-    client_queue: queue.Queue = queue.Queue()
-    with listeners_lock:
-        event_queues.append(client_queue)
+    # EventSource sends Last-Event-ID on its own reconnects; app.js passes it
+    # as a query parameter when it opens a fresh connection.
+    last_event_id = parse_last_event_id(
+        request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    )
+    # The stream outlives the request; don't pin a pooled connection for it.
+    close_db()
+    listener = EventListener(**parse_subscription(request.args.get, current_user_id()))
+    replay = register_listener(listener, last_event_id)
 
     def stream():
         try:
+            yield from replay
             while True:
-                try:
-                    event = client_queue.get(timeout=25)
-                except queue.Empty:
-                    yield "event: ping\ndata: {}\n\n"
-                    continue
-                yield f"data: {json.dumps(event)}\n\n"
+                frame = listener.get()
+                if frame is None:
+                    break
+                yield frame
         except GeneratorExit:
             pass
         finally:
-            with listeners_lock:
-                if client_queue in event_queues:
-                    event_queues.remove(client_queue)
+            unregister_listener(listener)
 
     return Response(stream_with_context(stream()), mimetype="text/event-stream")
 
 
+@app.get("/api/events/stats")
+@login_required
+def event_stats():
+    snapshot = list(event_listeners)
+    return jsonify(
+        {
+            "listeners": [
+                {
+                    "user_id": listener.user_id,
+                    "connected_at": listener.connected_at,
+                    "queued": listener.queue.qsize(),
+                    "overflows": listener.overflows,
+                    "dropped": listener.dropped,
+                    "policy": listener.policy,
+                    "types": sorted(listener.types) if listener.types else None,
+                    "assigned_only": listener.assigned_only,
+                }
+                for listener in snapshot
+            ]
+        }
+    )
+
+
+@app.errorhandler(PoolTimeout)
+def pool_timeout(_):
+    return jsonify({"error": "Server busy, try again."}), 503
+
+
+@app.errorhandler(HashingBusy)
+def hashing_busy(_):
+    return jsonify({"error": "Server busy, try again."}), 503
+
+
+@app.errorhandler(LoginThrottled)
+def login_throttled(exc):
+    response = jsonify({"error": "Too many attempts, try again later."})
+    response.headers["Retry-After"] = str(max(1, int(exc.retry_after + 0.5)))
+    return response, 429
+
+
 @app.errorhandler(404)
 def not_found(_):
     user_payload = (
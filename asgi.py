@@ -0,0 +1,169 @@
+# Optional ASGI entry point. /api/events is served natively on the event loop,
+# so each idle SSE client costs a coroutine and an asyncio queue instead of a
+# blocked worker thread; every other route is handed to the Flask app.
+#
+#   pip install uvicorn asgiref
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from itsdangerous import BadSignature
+from werkzeug.http import parse_cookie
+
+from app import (
+    EventListener,
+    app as flask_app,
+    parse_last_event_id,
+    parse_subscription,
+    register_listener,
+    unregister_listener,
+    verify_api_token,
+)
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError as exc:
+    raise RuntimeError("ASGI mode needs asgiref: pip install uvicorn asgiref") from exc
+
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+# Same overflow policy and counters as the threaded listener, but frames are
+# handed to the event loop that owns the asyncio queue.
+class AsyncEventListener(EventListener):
+    Full = asyncio.QueueFull
+    Empty = asyncio.QueueEmpty
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, **kwargs):
+        super().__init__(**kwargs)
+        self.loop = loop
+        self.queue = asyncio.Queue(self.queue.maxsize)
+
+    def put(self, frame, event_id=None):
+        self._call_soon(super().put, frame, event_id)
+
+    def ping(self):
+        self._call_soon(super().ping)
+
+    def _call_soon(self, callback, *args):
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The loop is gone; the listener is about to be unregistered.
+            pass
+
+    async def get(self):
+        item = await self.queue.get()
+        while self.is_stale(item):
+            item = await self.queue.get()
+        return None if item is None else item[1]
+
+
+def request_user_id(headers: dict) -> int | None:
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        user = verify_api_token(token.strip())
+        return user["id"] if user else None
+    cookie = headers.get(b"cookie")
+    if not cookie:
+        return None
+    value = parse_cookie(cookie.decode("latin-1")).get(
+        flask_app.config["SESSION_COOKIE_NAME"]
+    )
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    if not value or serializer is None:
+        return None
+    try:
+        data = serializer.loads(
+            value, max_age=int(flask_app.permanent_session_lifetime.total_seconds())
+        )
+    except BadSignature:
+        return None
+    return data.get("user_id")
+
+
+async def send_json(send, status: int, body: dict):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+async def events(scope, receive, send):
+    headers = dict(scope["headers"])
+    # A bearer token may need a user lookup, so keep it off the loop too.
+    user_id = await asyncio.to_thread(request_user_id, headers)
+    if user_id is None:
+        await send_json(send, 401, {"error": "Unauthorized"})
+        return
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    last_event_id = parse_last_event_id(
+        headers.get(b"last-event-id", b"").decode()
+        or query.get("last_event_id", [None])[0]
+    )
+    subscription = parse_subscription(lambda name: query.get(name, [None])[0], user_id)
+    listener = AsyncEventListener(asyncio.get_running_loop(), **subscription)
+    # Registration may read the replay log, so keep it off the loop.
+    replay = await asyncio.to_thread(register_listener, listener, last_event_id)
+
+    async def stream():
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                ],
+            }
+        )
+        for frame in replay:
+            await send({"type": "http.response.body", "body": frame, "more_body": True})
+        while True:
+            frame = await listener.get()
+            if frame is None:
+                break
+            await send({"type": "http.response.body", "body": frame, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def wait_for_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(stream()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        unregister_listener(listener)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+    elif (
+        scope["type"] == "http"
+        and scope["path"] == "/api/events"
+        and scope["method"] == "GET"
+    ):
+        await events(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -3,6 +3,8 @@
     currentUser: (window.APP_CONTEXT && window.APP_CONTEXT.user) || null,
     users: [],
     tasks: [],
+    version: null,
+    lastEventId: null,
     audioContext: null,
   };
 
@@ -377,12 +379,115 @@
     renderAssigneeOptions(users);
   }
 
+  function renderPeople() {
+    renderUsers(state.users);
+    renderAssigneeOptions(state.users);
+    renderTasks(state.tasks);
+  }
+
   async function fetchTasks() {
-    const { tasks } = await api("/api/tasks");
+    const { tasks, version } = await api("/api/tasks");
     state.tasks = tasks;
+    state.version = version;
     renderTasks(tasks);
   }
 
+  // Mirrors the server ordering (tasks.due_key, created_at DESC, id DESC).
+  function dueKey(task) {
+    if (!task.due_date) return "9999-12-31 23:59:59";
+    const dt = new Date(task.due_date);
+    if (isNaN(dt.getTime())) return "";
+    return dt.toISOString().slice(0, 19).replace("T", " ");
+  }
+
+  function compareTasks(a, b) {
+    const ka = dueKey(a);
+    const kb = dueKey(b);
+    if (ka !== kb) return ka < kb ? -1 : 1;
+    if (a.created_at !== b.created_at) return a.created_at > b.created_at ? -1 : 1;
+    return b.id - a.id;
+  }
+
+  function mergeTasks(changed, deletedIds) {
+    const byId = new Map(state.tasks.map((t) => [t.id, t]));
+    (deletedIds || []).forEach((id) => byId.delete(id));
+    (changed || []).forEach((t) => byId.set(t.id, t));
+    state.tasks = Array.from(byId.values()).sort(compareTasks);
+    renderTasks(state.tasks);
+  }
+
+  async function syncTasks() {
+    if (state.version === null || state.version === undefined) {
+      await fetchTasks();
+      return;
+    }
+    const { tasks, deleted, version } = await api(
+      `/api/tasks?since=${encodeURIComponent(state.version)}`
+    );
+    mergeTasks(tasks, deleted);
+    state.version = Math.max(state.version, version);
+  }
+
+  // Events carry the change version; a gap means we missed something, so fall
+  // back to a delta fetch instead of trusting local state.
+  function advanceVersion(version, fromVersion = version) {
+    if (typeof version !== "number") return;
+    if (state.version === null || state.version === undefined) return;
+    if (fromVersion > state.version + 1) {
+      syncTasks();
+      return;
+    }
+    state.version = Math.max(state.version, version);
+  }
+
+  function applyEvent(data, trackVersion = true) {
+    const payload = data.payload || {};
+    if (data.type === "batch") {
+      // Coalesced burst: task changes are merged and rendered once.
+      const changed = [];
+      const deleted = [];
+      (payload.events || []).forEach((e) => {
+        const p = e.payload || {};
+        if (e.type === "deleted") deleted.push(p.task_id);
+        else if (p.task) changed.push(p.task);
+        else applyEvent(e, false);
+      });
+      mergeTasks(changed, deleted);
+      advanceVersion(payload.version, payload.from_version);
+      return;
+    }
+    if (data.type === "bulk") {
+      mergeTasks(payload.tasks, payload.deleted);
+      if (trackVersion) advanceVersion(payload.version);
+      return;
+    }
+    if (data.type === "user_created" && payload.user) {
+      if (!state.users.some((u) => u.id === payload.user.id)) {
+        state.users = state.users.concat([payload.user]);
+        renderPeople();
+      }
+      return;
+    }
+    if (data.type === "user_deleted") {
+      state.users = state.users.filter((u) => u.id !== payload.user_id);
+      state.tasks.forEach((t) => {
+        if (t.assigned_user_id === payload.user_id) {
+          t.assigned_user_id = null;
+          t.assigned_username = null;
+        }
+      });
+      renderPeople();
+    } else if (data.type === "deleted") {
+      mergeTasks([], [payload.task_id]);
+    } else if (payload.task) {
+      mergeTasks([payload.task], []);
+    } else {
+      syncTasks();
+      return;
+    }
+    if (trackVersion) advanceVersion(payload.version);
+  }
+
   async function refreshAll() {
     await Promise.all([fetchUsers(), fetchTasks()]);
   }
@@ -395,14 +500,14 @@
     const dueTime = els.taskDueTime ? els.taskDueTime.value : "";
     const due_date = combineDateTime(dueDate, dueTime);
     try {
-      await api("/api/tasks", {
+      const { task } = await api("/api/tasks", {
         method: "POST",
         body: JSON.stringify({ title, assigned_user_id: assigned, due_date }),
       });
       els.taskTitle.value = "";
       if (els.taskDueDate) els.taskDueDate.value = "";
       if (els.taskDueTime) els.taskDueTime.value = "";
-      await refreshAll();
+      mergeTasks([task], []);
       chime("created");
     } catch (err) {
       toast(err.message, "error");
@@ -411,11 +516,11 @@
 
   async function toggleComplete(id, done) {
     try {
-      await api(`/api/tasks/${id}`, {
+      const { task } = await api(`/api/tasks/${id}`, {
         method: "PATCH",
         body: JSON.stringify({ completed: done }),
       });
-      await refreshAll();
+      mergeTasks([task], []);
     } catch (err) {
       toast(err.message, "error");
     }
@@ -424,11 +529,11 @@
   async function updateAssignee(id, assigned) {
     const payload = { assigned_user_id: assigned || null };
     try {
-      await api(`/api/tasks/${id}`, {
+      const { task } = await api(`/api/tasks/${id}`, {
         method: "PATCH",
         body: JSON.stringify(payload),
       });
-      await refreshAll();
+      mergeTasks([task], []);
     } catch (err) {
       toast(err.message, "error");
     }
@@ -437,11 +542,11 @@
   async function updateDueDate(id, dueInput, timeInput) {
     const due_date = combineDateTime(dueInput, timeInput);
     try {
-      await api(`/api/tasks/${id}`, {
+      const { task } = await api(`/api/tasks/${id}`, {
         method: "PATCH",
         body: JSON.stringify({ due_date }),
       });
-      await refreshAll();
+      mergeTasks([task], []);
     } catch (err) {
       toast(err.message, "error");
     }
@@ -450,7 +555,7 @@
   async function deleteTask(id) {
     try {
       await api(`/api/tasks/${id}`, { method: "DELETE" });
-      await refreshAll();
+      mergeTasks([], [id]);
       chime("deleted");
     } catch (err) {
       toast(err.message, "error");
@@ -535,19 +640,28 @@
   }
 
   function connectEvents() {
-    let source = new EventSource("/api/events");
+    const url = state.lastEventId
+      ? `/api/events?last_event_id=${encodeURIComponent(state.lastEventId)}`
+      : "/api/events";
+    let source = new EventSource(url);
     source.onmessage = (event) => {
+      if (event.lastEventId) state.lastEventId = event.lastEventId;
       try {
         const data = JSON.parse(event.data);
         toast(data.message);
         chime(data.type);
         maybeNotify(data);
-        refreshAll();
+        applyEvent(data);
       } catch (_) {
         refreshAll();
       }
     };
     source.addEventListener("ping", () => {});
+    // The server dropped events we were too slow to receive.
+    source.addEventListener("resync", (event) => {
+      if (event.lastEventId) state.lastEventId = event.lastEventId;
+      refreshAll();
+    });
     source.onerror = () => {
       toast("Connection lost, retrying...", "error");
       source.close();